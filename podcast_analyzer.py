@@ -1,11 +1,24 @@
 import os
 import google.generativeai as genai
-from pathlib import Path
-from pydub import AudioSegment
+import subprocess
+import io
+import json
 import tempfile
 import logging
 import time
 import streamlit as st
+from google.api_core import exceptions as google_exceptions
+
+# Gemini failures that a caller with retry machinery should see as
+# exceptions: rate limits, service blips and deadline overruns clear on
+# their own. Everything else (bad API key, malformed request, blocked
+# content) is permanent and stays a returned error string.
+TRANSIENT_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -16,90 +29,154 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class PodcastAnalyzer:
+    # Built once at class level so each instance doesn't rebuild it
+    GENERATION_CONFIG = {
+        "temperature": 1,
+        "top_p": 0.95,
+        "top_k": 40,
+        "max_output_tokens": 8192,
+    }
+
     def __init__(self):
         logger.info("Initializing PodcastAnalyzer")
         
-        # Configure Gemini using Streamlit secrets
-        api_key = st.secrets["GEMINI_API_KEY"]
+        # Configure Gemini from the environment (Celery workers) or
+        # Streamlit secrets (the app)
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            try:
+                api_key = st.secrets["GEMINI_API_KEY"]
+            except (KeyError, FileNotFoundError):
+                api_key = None
         if not api_key:
-            logger.error("GEMINI_API_KEY not found in Streamlit secrets")
-            raise ValueError("GEMINI_API_KEY not found in Streamlit secrets")
+            logger.error("GEMINI_API_KEY not found in environment or Streamlit secrets")
+            raise ValueError("GEMINI_API_KEY not found in environment or Streamlit secrets")
             
         genai.configure(api_key=api_key)
         logger.info("Gemini API configured successfully")
         
         # Create the model
-        generation_config = {
-            "temperature": 1,
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": 8192,
-        }
-        
         self.model = genai.GenerativeModel(
             model_name="gemini-2.0-flash-exp",
-            generation_config=generation_config,
+            generation_config=self.GENERATION_CONFIG,
         )
         logger.info("Gemini model initialized")
-    
+
+    def _probe_audio(self, audio_path):
+        """Get codec/channels/sample rate of the first audio stream via ffprobe"""
+        try:
+            result = subprocess.run([
+                "ffprobe", "-v", "error", "-select_streams", "a:0",
+                "-show_entries", "stream=codec_name,channels,sample_rate",
+                "-of", "json", audio_path
+            ], capture_output=True, check=True)
+            streams = json.loads(result.stdout).get("streams", [])
+            return streams[0] if streams else None
+        except (subprocess.CalledProcessError, json.JSONDecodeError, OSError) as e:
+            logger.warning(f"ffprobe failed for {audio_path}: {str(e)}")
+            return None
+
+    # Inputs above this size fall back to a temp file instead of piping the
+    # compressed output through memory
+    PIPE_MAX_INPUT_BYTES = 1 << 30
+
+    # Below this size, uploading the original beats decode+reencode+upload;
+    # Gemini decodes common codecs server-side and bills by duration
+    SKIP_TRANSFORM_MAX_BYTES = 50 * 1024 * 1024
+
+    # ffprobe codec names mapped to the mime types Gemini accepts; anything
+    # the transform produced is MP3, but untransformed originals are often
+    # AAC/m4a enclosures
+    CODEC_MIME_TYPES = {
+        "mp3": "audio/mp3",
+        "aac": "audio/aac",
+        "vorbis": "audio/ogg",
+        "opus": "audio/opus",
+        "flac": "audio/flac",
+        "pcm_s16le": "audio/wav",
+    }
+
+    def _upload_mime_type(self, audio_path):
+        """Mime type for uploading a file in its original encoding"""
+        stream = self._probe_audio(audio_path)
+        codec = stream.get("codec_name") if stream else None
+        return self.CODEC_MIME_TYPES.get(codec, "audio/mp3")
+
     def transform_audio(self, audio_path):
-        """Transform audio to reduce file size"""
+        """Transform audio to reduce file size.
+
+        Returns the compressed MP3 as bytes, or a file path (the original on
+        the fast-path, a temp file for very large inputs).
+        """
         try:
             start_time = time.time()
             logger.info(f"Starting audio transformation for: {audio_path}")
             
-            if not os.path.exists(audio_path):
+            # One stat covers both the existence check and the size
+            try:
+                original_bytes = os.stat(audio_path).st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
-            
-            # Get original file size
-            original_size = os.path.getsize(audio_path) / (1024 * 1024)
+
+            original_size = original_bytes / (1024 * 1024)
             logger.info(f"Original file size: {original_size:.2f} MB")
-            
-            try:
-                # Load audio file
-                logger.info("Loading audio file...")
-                audio = AudioSegment.from_file(audio_path)
-            except Exception as e:
-                raise Exception(f"Failed to load audio file: {str(e)}")
-            
-            logger.info(f"Original audio: {audio.channels} channels, {audio.frame_rate}Hz")
-            
-            try:
-                # Convert to mono
-                audio = audio.set_channels(1)
-                logger.info("Converted to mono")
-                
-                # Reduce sample rate to 16kHz
-                audio = audio.set_frame_rate(16000)
-                logger.info("Reduced sample rate to 16kHz")
-            except Exception as e:
-                raise Exception(f"Failed to process audio: {str(e)}")
-            
+
+            # Fast-path: if the file is already mono 16kHz MP3 the reencode
+            # would only burn CPU, so hand back the original untouched
+            stream = self._probe_audio(audio_path)
+            if (stream
+                    and stream.get("codec_name") == "mp3"
+                    and int(stream.get("channels", 0)) <= 1
+                    and int(stream.get("sample_rate", 0)) <= 16000):
+                logger.info("fast-path: reusing original audio (already mono/16kHz MP3)")
+                return audio_path
+
+            ffmpeg_args = [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+                "-i", audio_path,
+                "-vn", "-ac", "1", "-ar", "16000",
+                "-codec:a", "libmp3lame", "-q:a", "9",
+            ]
+
             try:
-                # Export with reduced quality
-                with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp_file:
-                    logger.info("Exporting compressed audio...")
-                    audio.export(tmp_file.name, format='mp3', 
-                               parameters=["-q:a", "9"])
-                    
-                    compressed_size = os.path.getsize(tmp_file.name) / (1024 * 1024)
+                # Convert to mono 16kHz MP3 directly with ffmpeg - no Python-level
+                # decode, so the uncompressed audio never lands on the Python heap
+                if original_bytes > self.PIPE_MAX_INPUT_BYTES:
+                    # Very large input: keep the compressed output on disk
+                    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp_file:
+                        logger.info("Converting audio with ffmpeg (temp file)...")
+                        subprocess.run(ffmpeg_args + [tmp_file.name], check=True)
+                        compressed_size = os.stat(tmp_file.name).st_size / (1024 * 1024)
+                        result = tmp_file.name
+                else:
+                    # Pipe the compressed output straight back - skips one full
+                    # write+read of the MP3 through the filesystem
+                    logger.info("Converting audio with ffmpeg (piped)...")
+                    proc = subprocess.run(
+                        ffmpeg_args + ["-f", "mp3", "pipe:1"],
+                        capture_output=True, check=True
+                    )
+                    compressed_size = len(proc.stdout) / (1024 * 1024)
+                    result = proc.stdout
+
+                # Skip the reduction math and string formatting entirely when
+                # INFO logging is off
+                if logger.isEnabledFor(logging.INFO):
                     reduction = ((original_size - compressed_size) / original_size) * 100
-                    
                     logger.info(f"Compressed file size: {compressed_size:.2f} MB")
                     logger.info(f"Size reduction: {reduction:.1f}%")
                     logger.info(f"Transformation completed in {time.time() - start_time:.1f} seconds")
-                    
-                    return tmp_file.name
-            except Exception as e:
-                raise Exception(f"Failed to export compressed audio: {str(e)}")
-            
+
+                return result
+            except subprocess.CalledProcessError as e:
+                raise Exception(f"Failed to convert audio with ffmpeg: {str(e)}")
+
         except Exception as e:
             logger.error(f"Error in transform_audio: {str(e)}", exc_info=True)
             raise
     
-    def analyze_audio_detailed(self, audio_path):
-        """First pass: Get detailed analysis of a podcast episode"""
-        DETAILED_PROMPT = """Analyze this podcast episode in detail. Focus on capturing:
+    # Long-form analysis used as source material for a second newsletter pass
+    DETAILED_PROMPT = """Analyze this podcast episode in detail. Focus on capturing:
 
 1. Main Topic & Context: What's being discussed and why it matters now
 2. Key Arguments/Points: The most important ideas and insights shared
@@ -109,41 +186,95 @@ class PodcastAnalyzer:
 
 Be thorough but clear - this is our source material for the final newsletter."""
 
-        transformed_audio_path = None
+    # Single-pass prompt that produces the briefing format directly, so no
+    # second Gemini call is needed to format the newsletter
+    COMBINED_PROMPT = """You're writing sharp, insider-style briefings for smart people who want the key points from important podcasts. Be concise and conversational - think smart friend giving quick insights over coffee.
+
+Analyze this podcast episode and format exactly like this, starting directly with TLDR (no introduction or meta-commentary):
+
+TLDR: [One punchy line that nails what this episode is really about]
+
+WHY NOW: [Quick context on the timing/relevance]
+
+KEY POINTS:
+→ [First insight - be specific and surprising]
+→ [Second insight - focus on what's newsworthy]
+→ [Third insight - highlight what matters most]
+
+QUOTED: "[Choose something short but powerful]" —[Speaker]
+
+Keep it tight, specific, and conversational. No jargon, no fluff. Start directly with TLDR - no introductory sentences."""
+
+    def analyze_audio_detailed(self, audio_path, two_pass=False):
+        """Analyze a podcast episode.
+
+        With two_pass=False (default) the prompt asks for the briefing format
+        directly; with two_pass=True it returns the long-form analysis meant
+        to feed generate_cohesive_newsletter.
+        """
+        prompt = self.DETAILED_PROMPT if two_pass else self.COMBINED_PROMPT
+
+        transformed_audio = None
+        audio_file = None
         try:
             logger.info(f"Starting detailed analysis for: {audio_path}")
-            
-            # Transform audio to reduce size
-            transformed_audio_path = self.transform_audio(audio_path)
-            
-            # Read the transformed audio file
-            logger.info("Reading transformed audio file...")
-            audio_data = Path(transformed_audio_path).read_bytes()
-            
-            # Send the audio with the prompt
+
+            # Small episodes skip compression entirely; larger ones are
+            # transformed (bytes when piped, path otherwise). A skipped file
+            # keeps its original codec, so probe for the real mime type
+            # instead of assuming MP3
+            if os.stat(audio_path).st_size < self.SKIP_TRANSFORM_MAX_BYTES:
+                logger.info("Skipping compression: file is small enough to upload as-is")
+                transformed_audio = audio_path
+                mime_type = self._upload_mime_type(audio_path)
+            else:
+                transformed_audio = self.transform_audio(audio_path)
+                mime_type = "audio/mp3"
+
+            # Upload via the Files API - the SDK streams the file instead of
+            # base64-inlining the whole thing into a single request body
+            logger.info("Uploading audio to Gemini Files API...")
+            if isinstance(transformed_audio, bytes):
+                audio_file = genai.upload_file(path=io.BytesIO(transformed_audio), mime_type=mime_type)
+            else:
+                audio_file = genai.upload_file(path=transformed_audio, mime_type=mime_type)
+
+            # Send the uploaded file reference with the prompt
             logger.info("Sending audio to Gemini for detailed analysis...")
             start_time = time.time()
-            
+
             response = self.model.generate_content([
-                DETAILED_PROMPT,
-                {
-                    "mime_type": "audio/mp3",
-                    "data": audio_data
-                }
+                prompt,
+                audio_file
             ])
-            
+
             logger.info(f"Detailed analysis completed in {time.time() - start_time:.1f} seconds")
             return response.text
-                
+
+        except TRANSIENT_GEMINI_ERRORS:
+            # Let retryable failures propagate; the finally block still
+            # cleans up the upload and any temp file
+            logger.error("Transient Gemini error in detailed analysis", exc_info=True)
+            raise
+
         except Exception as e:
             logger.error(f"Error in detailed analysis: {str(e)}", exc_info=True)
             return f"Error in detailed analysis: {str(e)}"
-            
+
         finally:
-            if transformed_audio_path and os.path.exists(transformed_audio_path):
+            if audio_file:
+                try:
+                    logger.info("Releasing uploaded file...")
+                    genai.delete_file(audio_file.name)
+                except Exception as e:
+                    logger.error(f"Failed to delete uploaded file: {str(e)}")
+            # Only delete the temp file; the fast-path returns the original
+            # and the piped path never touches disk
+            if (isinstance(transformed_audio, str) and transformed_audio != audio_path
+                    and os.path.exists(transformed_audio)):
                 try:
                     logger.info("Cleaning up temporary files...")
-                    os.unlink(transformed_audio_path)
+                    os.unlink(transformed_audio)
                 except Exception as e:
                     logger.error(f"Failed to clean up temporary file: {str(e)}")
 
@@ -188,9 +319,10 @@ Keep it tight and conversational. No jargon, no fluff. Write ONLY about the podc
             start_time = time.time()
             
             # Prepare the input by combining podcast name and analysis
-            combined_input = "Here are the podcast episode analyses to include (and ONLY these):\n\n"
+            parts = ["Here are the podcast episode analyses to include (and ONLY these):\n\n"]
             for podcast_name, analysis in podcast_analyses.items():
-                combined_input += f"# {podcast_name}\n\n{analysis}\n\n---\n\n"
+                parts.append(f"# {podcast_name}\n\n{analysis}\n\n---\n\n")
+            combined_input = "".join(parts)
             
             response = self.model.generate_content([
                 NEWSLETTER_PROMPT,
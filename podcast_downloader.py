@@ -1,49 +1,74 @@
+import asyncio
 import feedparser
-import requests
 import os
 from urllib.parse import urlparse
 from pathlib import Path
 
+import aiohttp
+
+# Cap on concurrent episode downloads
+MAX_CONCURRENT_DOWNLOADS = 8
+
+async def _download_one(session, semaphore, task):
+    title, audio_url, filename = task
+    async with semaphore:
+        print(f"Downloading: {title}")
+
+        try:
+            # Download the file
+            async with session.get(audio_url) as response:
+                response.raise_for_status()
+
+                # Save the file
+                with open(filename, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(1 << 20):
+                        f.write(chunk)
+
+            print(f"Saved to: {filename}")
+        except Exception as e:
+            print(f"Error downloading {title}: {str(e)}")
+
+async def _download_all(tasks):
+    # One session per run so DNS/TLS/TCP are shared; the semaphore keeps the
+    # number of in-flight downloads bounded
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    timeout = aiohttp.ClientTimeout(connect=5, sock_read=60)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        await asyncio.gather(*(_download_one(session, semaphore, task) for task in tasks))
+
 def download_podcast(rss_url, output_dir='downloads'):
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
+
     # Parse the RSS feed
     feed = feedparser.parse(rss_url)
-    
+
     print(f"Podcast: {feed.feed.title}")
     print(f"Found {len(feed.entries)} episodes")
-    
+
+    # Collect the episodes that still need downloading
+    tasks = []
     for entry in feed.entries:
-        # Find the audio file URL in the enclosures
-        for enclosure in entry.enclosures:
-            if 'audio' in enclosure.type:
-                audio_url = enclosure.href
-                
-                # Create filename from the URL
-                filename = os.path.join(output_dir, os.path.basename(urlparse(audio_url).path))
-                
-                # Skip if file already exists
-                if os.path.exists(filename):
-                    print(f"Skipping {filename} - already exists")
-                    continue
-                
-                print(f"Downloading: {entry.title}")
-                
-                try:
-                    # Download the file
-                    response = requests.get(audio_url, stream=True)
-                    response.raise_for_status()
-                    
-                    # Save the file
-                    with open(filename, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    print(f"Saved to: {filename}")
-                except Exception as e:
-                    print(f"Error downloading {entry.title}: {str(e)}")
+        # Find the first audio enclosure
+        audio_enc = next((e for e in entry.enclosures if e.type.startswith('audio/')), None)
+        if audio_enc is None:
+            continue
+        audio_url = audio_enc.href
+
+        # Create filename from the URL
+        filename = os.path.join(output_dir, os.path.basename(urlparse(audio_url).path))
+
+        # Skip if file already exists
+        if os.path.exists(filename):
+            print(f"Skipping {filename} - already exists")
+            continue
+
+        tasks.append((entry.title, audio_url, filename))
+
+    # Episode downloads are pure I/O, so overlap them on one event loop
+    if tasks:
+        asyncio.run(_download_all(tasks))
 
 if __name__ == "__main__":
     rss_url = input("Enter the podcast RSS feed URL: ")
-    download_podcast(rss_url) 
\ No newline at end of file
+    download_podcast(rss_url)
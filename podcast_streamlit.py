@@ -2,8 +2,12 @@ import streamlit as st
 import feedparser
 import requests
 import os
+import shutil
 from urllib.parse import urlparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import re
 import time
 from podcast_analyzer import PodcastAnalyzer
 import logging
@@ -11,6 +15,9 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so TLS/TCP connections are reused across downloads
+_SESSION = requests.Session()
+
 # Predefined RSS feeds
 PODCAST_FEEDS = {
     "The Ezra Klein Show": "https://feeds.simplecast.com/82FI35Px",
@@ -18,28 +25,44 @@ PODCAST_FEEDS = {
     "The Daily": "https://feeds.simplecast.com/54nAGcIl"
 }
 
+# Last-seen etag/modified and parse per feed URL, for conditional GETs
+_FEED_CONDITIONAL = {}
+
 # Cache for feed data
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def get_feed_data(rss_url):
-    return feedparser.parse(rss_url)
-
-# Hardcoded analysis prompt
-ANALYSIS_PROMPT = """You're writing sharp, insider-style briefings for smart people who want the key points from important podcasts. Be concise and conversational - think smart friend giving quick insights over coffee.
-
-Format exactly like this, starting directly with TLDR (no introduction or meta-commentary):
-
-TLDR: [One punchy line that nails what this episode is really about]
-
-WHY NOW: [Quick context on the timing/relevance]
+    # On cache expiry, revalidate with a conditional GET - a 304 means the
+    # server sent no body and we can reuse the previous parse
+    etag, modified, cached_feed = _FEED_CONDITIONAL.get(rss_url, (None, None, None))
+    feed = feedparser.parse(rss_url, etag=etag, modified=modified)
+    if cached_feed is not None and getattr(feed, 'status', None) == 304:
+        return cached_feed
+    _FEED_CONDITIONAL[rss_url] = (
+        getattr(feed, 'etag', None),
+        getattr(feed, 'modified', None),
+        feed,
+    )
+    return feed
 
-KEY POINTS:
-→ [First insight - be specific and surprising]
-→ [Second insight - focus on what's newsworthy]
-→ [Third insight - highlight what matters most]
+# One analyzer (and Gemini model handle) per Streamlit session
+@st.cache_resource
+def get_analyzer():
+    return PodcastAnalyzer()
 
-QUOTED: "[Choose something short but powerful]" —[Speaker]
+# When True, run the long-form analysis per episode plus a second Gemini
+# pass that writes the newsletter; the default single pass gets the
+# briefing format straight from the audio analysis
+TWO_PASS_NEWSLETTER = False
 
-Keep it tight, specific, and conversational. No jargon, no fluff. Start directly with TLDR - no introductory sentences."""
+# Markdown touch-ups for the analysis text, applied in one regex pass
+_FMT_MAP = {
+    "TLDR:": "**TLDR:**",
+    "WHY NOW:": "**WHY NOW:**",
+    "KEY POINTS:": "**KEY POINTS:**",
+    "QUOTED:": "**QUOTED:**",
+    "→": "▸",  # nicer bullet
+}
+_FMT_PATTERN = re.compile("|".join(map(re.escape, _FMT_MAP)))
 
 def generate_newsletter(analyses, feeds):
     """Generate a punchy newsletter from podcast analyses"""
@@ -57,11 +80,7 @@ def generate_newsletter(analyses, feeds):
         latest_episode = feed.entries[0]
         
         # Format the analysis text to ensure proper spacing and bullet points
-        formatted_analysis = analysis.replace("KEY POINTS:", "**KEY POINTS:**")
-        formatted_analysis = formatted_analysis.replace("→", "▸")  # nicer bullet
-        formatted_analysis = formatted_analysis.replace("TLDR:", "**TLDR:**")
-        formatted_analysis = formatted_analysis.replace("WHY NOW:", "**WHY NOW:**")
-        formatted_analysis = formatted_analysis.replace("QUOTED:", "**QUOTED:**")
+        formatted_analysis = _FMT_PATTERN.sub(lambda m: _FMT_MAP[m.group()], analysis)
         
         newsletter += f"""
 ---
@@ -76,12 +95,12 @@ def generate_newsletter(analyses, feeds):
 """
     return newsletter
 
+# Translation table mapping filename-invalid characters to underscores
+_INVALID_CHARS_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
 def sanitize_filename(filename):
     """Remove invalid characters from filename"""
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
-    return filename.strip('. ')
+    return filename.translate(_INVALID_CHARS_TABLE).strip('. ')
 
 def create_filename(entry, output_dir):
     """Create a filename from podcast entry with date and title"""
@@ -114,55 +133,95 @@ def get_podcast_image(feed):
         logger.error(f"Error getting podcast image: {str(e)}")
         return None
 
-def download_and_analyze_episode(rss_url, output_dir='downloads'):
+def _save_response(response, filename):
+    """Write a streamed response body to a file.
+
+    copyfileobj keeps the socket-to-file copy loop in C with a 1 MiB
+    buffer. sendfile(2) is not an option here: its input fd must be a
+    mmap-able regular file, never a socket, and the buffered reader's
+    read-ahead already holds the first body bytes anyway.
+    """
+    raw = response.raw
+    raw.decode_content = True
+    with open(filename, 'wb') as f:
+        shutil.copyfileobj(raw, f, length=1 << 20)
+
+@st.cache_data(ttl=3600)
+def get_feed_summary(rss_url):
+    """Image URL and latest episode title for a feed, cached as one lookup"""
+    feed = get_feed_data(rss_url)
+    latest_title = feed.entries[0].title if feed.entries else None
+    return get_podcast_image(feed), latest_title
+
+def download_and_analyze_episode(rss_url, analyzer, output_dir='downloads', two_pass=False):
     """Download and analyze a podcast episode, return the analysis"""
     try:
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
         feed = feedparser.parse(rss_url)
         if not feed.entries:
-            st.error("No episodes found in the feed.")
+            logger.error(f"No episodes found in the feed: {rss_url}")
             return None
         
         # Get latest episode
         entry = feed.entries[0]
-        
+
+        # Episodes are immutable once published - reuse any analysis we
+        # already have for this GUID and skip download/ffmpeg/Gemini entirely
+        cache_path = _cached_analysis_path(entry, two_pass)
+        if cache_path.exists():
+            logger.info(f"Using cached analysis: {cache_path.name}")
+            return cache_path.read_text()
+
         # Create podcast-specific subdirectory
         podcast_dir = os.path.join(output_dir, sanitize_filename(feed.feed.title))
         Path(podcast_dir).mkdir(parents=True, exist_ok=True)
         
-        # Find audio URL and download
-        for enclosure in entry.enclosures:
-            if 'audio' in enclosure.type:
-                audio_url = enclosure.href
-                filename = create_filename(entry, podcast_dir)
-                
-                if os.path.exists(filename):
-                    st.info(f"Using existing file: {os.path.basename(filename)}")
-                else:
-                    with st.spinner(f"Downloading: {entry.title}"):
-                        response = requests.get(audio_url, stream=True)
-                        response.raise_for_status()
-                        
-                        with open(filename, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                f.write(chunk)
-                        
-                        st.success(f"Downloaded: {os.path.basename(filename)}")
-                
-                # Get detailed analysis
-                with st.spinner('Analyzing podcast content...'):
-                    analyzer = PodcastAnalyzer()
-                    detailed_analysis = analyzer.analyze_audio_detailed(filename)
-                    if detailed_analysis.startswith("Error"):
-                        st.error(detailed_analysis)
-                        return None
-                    return detailed_analysis
-                
+        # Find the first audio enclosure and download it
+        audio_enc = next((e for e in entry.enclosures if e.type.startswith('audio/')), None)
+        if audio_enc is None:
+            logger.error(f"No audio enclosure found for: {entry.title}")
+            return None
+
+        audio_url = audio_enc.href
+        filename = create_filename(entry, podcast_dir)
+
+        if os.path.exists(filename):
+            logger.info(f"Using existing file: {os.path.basename(filename)}")
+        else:
+            logger.info(f"Downloading: {entry.title}")
+            response = _SESSION.get(audio_url, stream=True, timeout=(5, 60))
+            response.raise_for_status()
+
+            _save_response(response, filename)
+
+            logger.info(f"Downloaded: {os.path.basename(filename)}")
+
+        # Get the analysis (briefing format unless two_pass)
+        detailed_analysis = analyzer.analyze_audio_detailed(filename, two_pass=two_pass)
+        if detailed_analysis.startswith("Error"):
+            logger.error(detailed_analysis)
+            return None
+
+        ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(detailed_analysis)
+        return detailed_analysis
+
     except Exception as e:
-        st.error(f"Error: {str(e)}")
+        logger.error(f"Error analyzing episode from {rss_url}: {str(e)}", exc_info=True)
         return None
 
+ANALYSIS_CACHE_DIR = Path('analysis_cache')
+
+def _cache_key(entry):
+    """Stable cache key for an episode, from its GUID or enclosure URL"""
+    guid = getattr(entry, 'id', None) or entry.enclosures[0].href
+    return hashlib.sha256(guid.encode()).hexdigest()
+
+def _cached_analysis_path(entry, two_pass):
+    suffix = '_detailed' if two_pass else ''
+    return ANALYSIS_CACHE_DIR / f"{_cache_key(entry)}{suffix}.md"
+
 def truncate_title(title, max_length=50):
     """Truncate title to a fixed length"""
     return title[:max_length] + "..." if len(title) > max_length else title
@@ -190,23 +249,26 @@ def main():
     # Create a 3-column layout for podcast cards
     podcast_cols = st.columns(3)
     selected_podcasts = {}
-    
-    for idx, (podcast_name, rss_url) in enumerate(PODCAST_FEEDS.items()):
+
+    # Resolve all card data up front; each rerun then renders from plain
+    # tuples without touching feedparser structures
+    cards = {name: get_feed_summary(url) for name, url in PODCAST_FEEDS.items()}
+
+    for idx, podcast_name in enumerate(PODCAST_FEEDS):
         with podcast_cols[idx % 3]:
             # Container for the entire card
             with st.container():
                 # Get and display podcast image
-                feed = get_feed_data(rss_url)
-                image_url = get_podcast_image(feed)
+                image_url, latest_title = cards[podcast_name]
                 if image_url:
                     st.image(image_url, width=300)
-                
+
                 # Title
                 st.markdown(f"#### {podcast_name}")
-                
+
                 # Episode title - truncated
-                if feed.entries:
-                    st.caption(f"Latest: {truncate_title(feed.entries[0].title)}")
+                if latest_title:
+                    st.caption(f"Latest: {truncate_title(latest_title)}")
                 else:
                     st.caption("No episodes available")
                 
@@ -237,32 +299,43 @@ def main():
         
         # Collect all analyses
         detailed_analyses = {}
-        total_selected = sum(selected_podcasts.values())
-        current = 0
-        
-        # First pass: Get detailed analysis for each podcast
-        for podcast_name, is_selected in selected_podcasts.items():
-            if is_selected:
-                current += 1
-                progress = current / total_selected
-                progress_bar.progress(progress)
-                status_text.write(f"Analyzing: {podcast_name} ({current}/{total_selected})")
-                
-                analysis = download_and_analyze_episode(PODCAST_FEEDS[podcast_name])
+        selected_names = [name for name, is_selected in selected_podcasts.items() if is_selected]
+        total_selected = len(selected_names)
+        analyzer = get_analyzer()
+
+        # First pass: analyze all selected podcasts concurrently - each one is
+        # network download + ffmpeg + Gemini RPC, so the work is I/O-bound
+        with ThreadPoolExecutor(max_workers=total_selected) as executor:
+            futures = {
+                executor.submit(download_and_analyze_episode, PODCAST_FEEDS[name], analyzer,
+                                two_pass=TWO_PASS_NEWSLETTER): name
+                for name in selected_names
+            }
+            completed = 0
+            for future in as_completed(futures):
+                podcast_name = futures[future]
+                completed += 1
+                progress_bar.progress(completed / total_selected)
+                status_text.write(f"Analyzed: {podcast_name} ({completed}/{total_selected})")
+
+                analysis = future.result()
                 if analysis:
                     detailed_analyses[podcast_name] = analysis
-        
+
         # Clear progress indicators
         progress_bar.empty()
         status_text.empty()
         
         if detailed_analyses:
-            # Second pass: Generate cohesive newsletter
+            # Assemble the newsletter - locally from the briefings, or with a
+            # second Gemini pass over the long-form analyses
             st.write("### 📝 Generating Newsletter")
             with st.spinner('Crafting your briefing...'):
-                analyzer = PodcastAnalyzer()
-                newsletter = analyzer.generate_cohesive_newsletter(detailed_analyses)
-            
+                if TWO_PASS_NEWSLETTER:
+                    newsletter = analyzer.generate_cohesive_newsletter(detailed_analyses)
+                else:
+                    newsletter = generate_newsletter(detailed_analyses, PODCAST_FEEDS)
+
             if newsletter.startswith("Error"):
                 st.error("Failed to generate newsletter. Please try again.")
                 return
@@ -0,0 +1,31 @@
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import crud
+from src.db.session import get_async_db, init_db
+
+app = FastAPI(title="podbriefing")
+
+@app.on_event("startup")
+def startup():
+    init_db()
+
+@app.get("/episodes/{episode_id}")
+async def read_episode(episode_id: int, db: AsyncSession = Depends(get_async_db)):
+    episode = await crud.async_get_episode(db, episode_id)
+    if episode is None:
+        raise HTTPException(status_code=404, detail="Episode not found")
+    return episode
+
+@app.get("/podcasts/{podcast_name}/episodes")
+async def read_podcast_episodes(podcast_name: str, limit: int = 10,
+                                db: AsyncSession = Depends(get_async_db)):
+    return await crud.async_get_episodes_by_podcast(db, podcast_name, limit)
+
+@app.get("/briefs")
+async def read_recent_briefs(limit: int = 10, db: AsyncSession = Depends(get_async_db)):
+    return await crud.async_get_recent_briefs(db, limit)
+
+@app.get("/leads")
+async def read_recent_leads(limit: int = 10, db: AsyncSession = Depends(get_async_db)):
+    return await crud.async_get_recent_leads(db, limit)
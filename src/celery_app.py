@@ -0,0 +1,36 @@
+import os
+
+from celery import Celery
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+celery_app = Celery(
+    "podbriefing",
+    broker=REDIS_URL,
+    backend=REDIS_URL,
+    include=["src.tasks.download", "src.tasks.analyze"],
+)
+
+celery_app.conf.update(
+    # msgpack encodes the transcript-heavy payloads several times faster
+    # than json, and gzip keeps the Redis bodies small on the wire
+    task_serializer='msgpack',
+    result_serializer='msgpack',
+    accept_content=['msgpack', 'json'],
+    task_compression='gzip',
+    result_compression='gzip',
+    result_backend_transport_options={'global_keyprefix': 'pb:'},
+    # Long Gemini calls make prefetched tasks starve behind a busy worker;
+    # fetch one task at a time and ack only after it finishes
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_routes={
+        'src.tasks.analyze.*': {'queue': 'analyze'},
+        'src.tasks.download.*': {'queue': 'download'},
+    },
+    # Must exceed the longest task run so late-acked tasks aren't redelivered
+    broker_transport_options={'visibility_timeout': 3600},
+    timezone='UTC',
+    enable_utc=True,
+)
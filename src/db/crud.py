@@ -0,0 +1,333 @@
+import json
+import logging
+
+import redis
+import redis.asyncio
+from sqlalchemy import bindparam, case, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload, undefer
+
+from src.celery_app import REDIS_URL
+from src.db import models
+
+logger = logging.getLogger(__name__)
+
+# Short-TTL cache for the hot recent-list reads; a miss or Redis outage
+# just falls through to Postgres
+_redis = redis.Redis.from_url(REDIS_URL)
+RECENT_CACHE_TTL = 30
+
+def _cached_recent(key, loader):
+    try:
+        hit = _redis.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Redis unavailable, reading from Postgres: {str(e)}")
+        return loader()
+    if hit is not None:
+        return json.loads(hit)
+    rows = loader()
+    try:
+        _redis.set(key, json.dumps(rows), ex=RECENT_CACHE_TTL)
+    except redis.RedisError:
+        pass
+    return rows
+
+def invalidate_recent_cache():
+    """Drop the cached recent lists; call only after a successful commit.
+
+    Invalidating before the writing transaction commits lets a concurrent
+    read re-cache the pre-write list, which then serves stale for a full
+    TTL. Tasks that batch writes with commit=False call this themselves
+    once their own commit lands.
+    """
+    try:
+        keys = [k for pattern in ("recent_briefs:*", "recent_leads:*")
+                for k in _redis.scan_iter(pattern)]
+        if keys:
+            _redis.delete(*keys)
+    except redis.RedisError:
+        pass
+
+def _analysis_to_dict(analysis):
+    # List preview only - result_text is deferred and stays in the database;
+    # get_analysis_by_type undefers it for detail reads
+    return {
+        "id": analysis.id,
+        "episode_id": analysis.episode_id,
+        "podcast_name": analysis.episode.podcast_name if analysis.episode else None,
+        "analysis_type": analysis.analysis_type.value,
+        "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
+    }
+
+# One bit per AnalysisType, by member position
+_ANALYSIS_BITS = {t: 1 << i for i, t in enumerate(models.AnalysisType)}
+_ALL_ANALYSES_MASK = (1 << len(models.AnalysisType)) - 1
+
+# Statements built once at import; per-call work is just binding parameters,
+# not re-running the SQL compiler. get_episode is excluded - Session.get
+# already uses a precompiled primary-key lookup.
+_EPISODES_BY_PODCAST = (
+    select(models.Episode)
+    .options(selectinload(models.Episode.analyses))
+    .where(models.Episode.podcast_name == bindparam("podcast_name"))
+    .order_by(models.Episode.created_at.desc())
+    .limit(bindparam("limit"))
+)
+
+_EPISODE_ANALYSES = (
+    select(models.Analysis)
+    .options(undefer(models.Analysis.result_text))
+    .where(models.Analysis.episode_id == bindparam("episode_id"))
+)
+
+_ANALYSIS_BY_TYPE = (
+    select(models.Analysis)
+    .options(undefer(models.Analysis.result_text))
+    .where(
+        models.Analysis.episode_id == bindparam("episode_id"),
+        models.Analysis.analysis_type == bindparam("analysis_type"),
+    )
+    .order_by(models.Analysis.created_at.desc())
+    .limit(1)
+)
+
+# Column-only header select: a Core Row tuple per result instead of a full
+# ORM Episode instance
+_EPISODE_HEADER_COLS = select(
+    models.Episode.id,
+    models.Episode.podcast_name,
+    models.Episode.episode_title,
+    models.Episode.created_at,
+).where(models.Episode.podcast_name == bindparam("podcast_name")).order_by(
+    models.Episode.created_at.desc()
+)
+
+_EPISODE_HEADERS = _EPISODE_HEADER_COLS.limit(bindparam("limit"))
+
+_EPISODE_HEADERS_STREAM = _EPISODE_HEADER_COLS.execution_options(yield_per=1000)
+
+_RECENT_ANALYSES = (
+    select(models.Analysis)
+    .options(selectinload(models.Analysis.episode))
+    .where(models.Analysis.analysis_type == bindparam("analysis_type"))
+    .order_by(models.Analysis.created_at.desc())
+    .limit(bindparam("limit"))
+)
+
+def create_episode(db, rss_url, podcast_name, episode_title, commit=True):
+    """Idempotently insert an episode in PENDING state, returning its id.
+
+    ON CONFLICT DO NOTHING against the (rss_url, episode_title) unique
+    constraint means the common (new) case is one round-trip and a re-seen
+    episode costs one extra id SELECT, with no check-then-insert race.
+    Pipeline steps pass commit=False so a whole unit of work shares one
+    commit (and one fsync) at the task boundary.
+    """
+    stmt = (
+        pg_insert(models.Episode)
+        .values(rss_url=rss_url, podcast_name=podcast_name, episode_title=episode_title)
+        .on_conflict_do_nothing(index_elements=["rss_url", "episode_title"])
+        .returning(models.Episode.id)
+    )
+    episode_id = db.execute(stmt).scalar()
+    if episode_id is None:
+        episode_id = db.execute(
+            select(models.Episode.id).where(
+                models.Episode.rss_url == rss_url,
+                models.Episode.episode_title == episode_title,
+            )
+        ).scalar_one()
+    if commit:
+        db.commit()
+    return episode_id
+
+def bulk_create_episodes(db, rows):
+    """Insert many episodes in one round-trip, skipping ones already seen.
+
+    rows is a list of dicts with rss_url/podcast_name/episode_title keys.
+    ON CONFLICT DO NOTHING against the (rss_url, episode_title) unique
+    constraint makes re-ingesting a feed safe - a duplicate no longer
+    aborts the whole batch with an IntegrityError. Returns the ids of the
+    newly inserted rows only; conflicting rows return nothing.
+    """
+    if not rows:
+        return []
+    stmt = (
+        pg_insert(models.Episode)
+        .on_conflict_do_nothing(index_elements=["rss_url", "episode_title"])
+        .returning(models.Episode.id)
+    )
+    ids = db.execute(stmt, rows).scalars().all()
+    db.commit()
+    return ids
+
+def bulk_create_analyses(db, rows):
+    """Insert many analyses with one statement and one commit"""
+    if not rows:
+        return
+    db.execute(insert(models.Analysis), rows)
+    db.commit()
+    invalidate_recent_cache()
+
+def get_episode(db, episode_id):
+    # Session.get hits the identity map first (zero SQL on repeat lookups
+    # in a transaction) and uses the precompiled primary-key query on miss
+    return db.get(models.Episode, episode_id)
+
+def list_episode_headers(db, podcast_name, limit=10):
+    """Episode header rows as plain Core tuples.
+
+    Callers that only render id/podcast/title/date skip the per-row ORM
+    instance and identity-map bookkeeping of get_episodes_by_podcast.
+    """
+    return db.execute(
+        _EPISODE_HEADERS, {"podcast_name": podcast_name, "limit": limit}
+    ).all()
+
+def iter_episode_headers(db, podcast_name):
+    """Stream every header row for a podcast in batches of 1000.
+
+    yield_per keeps memory flat no matter how many episodes the internal
+    across-all-episodes paths walk.
+    """
+    return db.execute(_EPISODE_HEADERS_STREAM, {"podcast_name": podcast_name})
+
+def get_episodes_by_podcast(db, podcast_name, limit=10):
+    return db.execute(
+        _EPISODES_BY_PODCAST, {"podcast_name": podcast_name, "limit": limit}
+    ).scalars().all()
+
+def update_episode_status(db, episode_id, status, commit=True):
+    # Single UPDATE ... RETURNING instead of SELECT-then-UPDATE-then-refresh
+    stmt = (
+        update(models.Episode)
+        .where(models.Episode.id == episode_id)
+        .values(status=status)
+        .returning(models.Episode)
+    )
+    episode = db.execute(stmt).scalar_one_or_none()
+    if commit:
+        db.commit()
+    return episode
+
+def update_episode_audio_path(db, episode_id, audio_path, commit=True):
+    stmt = (
+        update(models.Episode)
+        .where(models.Episode.id == episode_id)
+        .values(audio_path=audio_path)
+        .returning(models.Episode)
+    )
+    episode = db.execute(stmt).scalar_one_or_none()
+    if commit:
+        db.commit()
+    return episode
+
+def create_analysis(db, episode_id, analysis_type, result_text, commit=True):
+    """Store an analysis; marks the episode COMPLETED once all types exist"""
+    analysis = models.Analysis(
+        episode_id=episode_id,
+        analysis_type=analysis_type,
+        result_text=result_text,
+    )
+    db.add(analysis)
+
+    # OR this analysis's bit into the episode's mask and flip the status in
+    # the same UPDATE - completion tracking costs no extra query at all
+    new_mask = models.Episode.analyses_done_mask.op("|")(_ANALYSIS_BITS[analysis_type])
+    db.execute(
+        update(models.Episode)
+        .where(models.Episode.id == episode_id)
+        .values(
+            analyses_done_mask=new_mask,
+            status=case(
+                (new_mask == _ALL_ANALYSES_MASK,
+                 literal(models.ProcessingStatus.COMPLETED, type_=models.Episode.status.type)),
+                else_=models.Episode.status,
+            ),
+        )
+    )
+
+    # Insert and status change land in one commit; invalidation only
+    # after that commit, or a concurrent read re-caches the old list.
+    # commit=False callers invalidate after their own commit.
+    if commit:
+        db.commit()
+        invalidate_recent_cache()
+    return analysis
+
+def get_episode_analyses(db, episode_id):
+    return db.execute(_EPISODE_ANALYSES, {"episode_id": episode_id}).scalars().all()
+
+def get_analysis_by_type(db, episode_id, analysis_type):
+    return db.execute(
+        _ANALYSIS_BY_TYPE, {"episode_id": episode_id, "analysis_type": analysis_type}
+    ).scalar_one_or_none()
+
+def _recent_analyses(db, analysis_type, limit):
+    rows = db.execute(
+        _RECENT_ANALYSES, {"analysis_type": analysis_type, "limit": limit}
+    ).scalars().all()
+    return [_analysis_to_dict(a) for a in rows]
+
+def get_recent_briefs(db, limit=10):
+    """Most recent briefs as plain dicts, served from Redis when fresh"""
+    return _cached_recent(
+        f"recent_briefs:{limit}",
+        lambda: _recent_analyses(db, models.AnalysisType.BRIEF, limit),
+    )
+
+def get_recent_leads(db, limit=10):
+    """Most recent leads as plain dicts, served from Redis when fresh"""
+    return _cached_recent(
+        f"recent_leads:{limit}",
+        lambda: _recent_analyses(db, models.AnalysisType.LEAD, limit),
+    )
+
+# Async variants of the read helpers, used by the FastAPI handlers over
+# asyncpg; the Celery pipeline keeps the sync helpers above. These get
+# their own async Redis client - a sync get/set here would block the
+# event loop and every in-flight request with it.
+
+_async_redis = redis.asyncio.Redis.from_url(REDIS_URL)
+
+async def _cached_recent_async(key, loader):
+    try:
+        hit = await _async_redis.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Redis unavailable, reading from Postgres: {str(e)}")
+        return await loader()
+    if hit is not None:
+        return json.loads(hit)
+    rows = await loader()
+    try:
+        await _async_redis.set(key, json.dumps(rows), ex=RECENT_CACHE_TTL)
+    except redis.RedisError:
+        pass
+    return rows
+
+async def async_get_episode(db, episode_id):
+    return await db.get(models.Episode, episode_id)
+
+async def async_get_episodes_by_podcast(db, podcast_name, limit=10):
+    result = await db.execute(
+        _EPISODES_BY_PODCAST, {"podcast_name": podcast_name, "limit": limit}
+    )
+    return result.scalars().all()
+
+async def _async_recent_analyses(db, analysis_type, limit):
+    result = await db.execute(
+        _RECENT_ANALYSES, {"analysis_type": analysis_type, "limit": limit}
+    )
+    return [_analysis_to_dict(a) for a in result.scalars()]
+
+async def async_get_recent_briefs(db, limit=10):
+    return await _cached_recent_async(
+        f"recent_briefs:{limit}",
+        lambda: _async_recent_analyses(db, models.AnalysisType.BRIEF, limit),
+    )
+
+async def async_get_recent_leads(db, limit=10):
+    return await _cached_recent_async(
+        f"recent_leads:{limit}",
+        lambda: _async_recent_analyses(db, models.AnalysisType.LEAD, limit),
+    )
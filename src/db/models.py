@@ -0,0 +1,93 @@
+import enum
+
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Index, Integer, SmallInteger, String,
+    UniqueConstraint, func,
+)
+from sqlalchemy.dialects.postgresql import CITEXT
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.types import TypeDecorator
+
+from src.db.session import Base
+
+class EnumAsInt(TypeDecorator):
+    """Store a Python Enum as its member position in a SmallInteger.
+
+    Far narrower rows and index entries than a Postgres ENUM's textual
+    values, and adding a member needs no ALTER TYPE - new members just have
+    to be appended after existing ones.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls, **kwargs):
+        super().__init__(**kwargs)
+        self._members = list(enum_cls)
+        self._positions = {member: i for i, member in enumerate(self._members)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._positions[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
+
+class ProcessingStatus(enum.Enum):
+    PENDING = "pending"
+    DOWNLOADING = "downloading"
+    ANALYZING = "analyzing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class AnalysisType(enum.Enum):
+    BRIEF = "brief"
+    LEAD = "lead"
+
+class Episode(Base):
+    __tablename__ = "episodes"
+    # Serves get_episodes_by_podcast's filter + ORDER BY created_at DESC;
+    # the unique constraint makes feed ingestion idempotent
+    __table_args__ = (
+        Index("ix_episodes_podcast_created", "podcast_name", "created_at"),
+        UniqueConstraint("rss_url", "episode_title", name="uq_episodes_rss_url_episode_title"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    rss_url = Column(String(2048), nullable=False)
+    # CITEXT so lookups by podcast name are case-insensitive without a
+    # lower() wrapper that would defeat the index
+    podcast_name = Column(CITEXT(), nullable=False)
+    episode_title = Column(String(512), nullable=False)
+    audio_path = Column(String(1024))
+    status = Column(EnumAsInt(ProcessingStatus), default=ProcessingStatus.PENDING, nullable=False)
+    # Bit per AnalysisType (by member position); all-bits-set means every
+    # analysis for the episode has landed
+    analyses_done_mask = Column(SmallInteger, default=0, server_default="0", nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True, nullable=False)
+
+    # lazy="raise" turns any accidental per-row lazy load into a loud
+    # error; list queries opt in with selectinload
+    analyses = relationship("Analysis", back_populates="episode", lazy="raise")
+
+class Analysis(Base):
+    __tablename__ = "analyses"
+    # Serve get_recent_leads/briefs (type + recency) and the per-episode
+    # type lookups without a seq-scan + sort
+    __table_args__ = (
+        Index("ix_analyses_type_created", "analysis_type", "created_at"),
+        Index("ix_analyses_episode_type", "episode_id", "analysis_type"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    episode_id = Column(Integer, ForeignKey("episodes.id"), nullable=False)
+    analysis_type = Column(EnumAsInt(AnalysisType), nullable=False)
+    # Brief/lead bodies run to kilobytes; deferred keeps them out of list
+    # queries, which undefer explicitly when they need the text
+    result_text = deferred(Column(String, nullable=False))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True, nullable=False)
+
+    episode = relationship("Episode", back_populates="analyses", lazy="raise")
@@ -0,0 +1,75 @@
+import os
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost:5432/podbriefing")
+
+# One pooled engine per process, shared by the API and Celery workers.
+# Defaults are tuned for FastAPI + Celery concurrency; pre_ping and recycle
+# detect and rotate connections Postgres has dropped.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    query_cache_size=1200,
+    connect_args={
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 5,
+    },
+)
+
+# expire_on_commit=False keeps attributes readable after commit without a
+# reload SELECT; server-generated values come back via RETURNING instead
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine for the FastAPI handlers: one event-loop worker multiplexes
+# many in-flight queries over pooled asyncpg connections. Uses the default
+# AsyncAdaptedQueuePool; asyncpg handles TCP keepalives itself, so no
+# connect_args here. The sync engine stays for Celery workers.
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    query_cache_size=1200,
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+Base = declarative_base()
+
+def get_db():
+    """FastAPI dependency yielding a session that is always closed"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """FastAPI dependency yielding a fresh AsyncSession per request.
+
+    Sessions must never be shared across concurrent requests.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def init_db():
+    # No migration tooling in this project yet; create tables directly.
+    # Episode.podcast_name is CITEXT, which lives in an extension, so a
+    # fresh database needs it created before the tables that use it.
+    from src.db import models  # noqa: F401
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
+        Base.metadata.create_all(bind=conn)
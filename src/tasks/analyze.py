@@ -0,0 +1,83 @@
+import logging
+import os
+
+from src.celery_app import celery_app
+from src.db import crud, models
+from src.db.session import SessionLocal
+from podcast_analyzer import TRANSIENT_GEMINI_ERRORS, PodcastAnalyzer
+
+logger = logging.getLogger(__name__)
+
+class TransientGeminiError(Exception):
+    """A Gemini call failed in a way that is worth retrying.
+
+    Only raised for the exception types in TRANSIENT_GEMINI_ERRORS (rate
+    limits, service blips, deadlines); permanent failures come back from
+    the analyzer as error strings and are never retried.
+    """
+
+# One analyzer (Gemini client + model handle) per worker process instead of
+# one per task invocation
+_analyzer = None
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = PodcastAnalyzer()
+    return _analyzer
+
+@celery_app.task(bind=True, autoretry_for=(TransientGeminiError,), max_retries=2,
+                 retry_backoff=True, retry_jitter=True, ignore_result=True)
+def analyze_podcast(self, episode_id, audio_path):
+    """Run the brief and lead analyses for a downloaded episode"""
+    # One stat covers existence and size; a missing or truncated download is
+    # permanent, so bail out without burning retry cycles on it
+    try:
+        st = os.stat(audio_path)
+    except FileNotFoundError:
+        return f"Audio file not found: {audio_path}"
+    if st.st_size == 0:
+        return f"Empty audio file: {audio_path}"
+
+    db = SessionLocal()
+    try:
+        analyzer = _get_analyzer()
+
+        # One commit covers both analyses and the COMPLETED status change
+        brief = analyzer.analyze_audio_detailed(audio_path)
+        if brief.startswith("Error"):
+            # Permanent Gemini failure (transient ones raise instead)
+            crud.update_episode_status(db, episode_id, models.ProcessingStatus.FAILED)
+            return brief
+        crud.create_analysis(db, episode_id, models.AnalysisType.BRIEF, brief, commit=False)
+
+        lead = analyzer.analyze_audio_detailed(audio_path, two_pass=True)
+        if lead.startswith("Error"):
+            db.rollback()
+            crud.update_episode_status(db, episode_id, models.ProcessingStatus.FAILED)
+            return lead
+        crud.create_analysis(db, episode_id, models.AnalysisType.LEAD, lead, commit=False)
+
+        db.commit()
+        crud.invalidate_recent_cache()
+        return episode_id
+    except TRANSIENT_GEMINI_ERRORS as exc:
+        db.rollback()
+        # ignore_result=True means nobody observes the final failure, so
+        # the last attempt must mark the row FAILED itself or it would sit
+        # in ANALYZING forever
+        if self.request.retries >= self.max_retries:
+            crud.update_episode_status(db, episode_id, models.ProcessingStatus.FAILED)
+        raise TransientGeminiError(str(exc)) from exc
+    except Exception as exc:
+        logger.error(f"Analysis failed for episode {episode_id}: {str(exc)}", exc_info=True)
+        db.rollback()
+        crud.update_episode_status(db, episode_id, models.ProcessingStatus.FAILED)
+        raise
+    finally:
+        db.close()
+
+@celery_app.task
+def generate_newsletter(podcast_analyses):
+    """Write a cohesive newsletter from a {podcast_name: analysis} dict"""
+    return _get_analyzer().generate_cohesive_newsletter(podcast_analyses)
@@ -0,0 +1,52 @@
+import logging
+import os
+from pathlib import Path
+
+import requests
+
+from src.celery_app import celery_app
+from src.db import crud, models
+from src.db.session import SessionLocal
+from src.tasks.analyze import analyze_podcast
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(bind=True, max_retries=3, ignore_result=True)
+def download_episode(self, episode_id, audio_url, output_dir='downloads'):
+    """Download an episode's audio and hand it off to analysis"""
+    db = SessionLocal()
+    try:
+        crud.update_episode_status(db, episode_id, models.ProcessingStatus.DOWNLOADING)
+
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        filename = os.path.join(output_dir, f"episode_{episode_id}.mp3")
+
+        logger.info(f"Downloading episode {episode_id} from {audio_url}")
+        response = requests.get(audio_url, stream=True, timeout=(5, 60))
+        response.raise_for_status()
+
+        with open(filename, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+
+        # Catch truncated downloads here, at enqueue time, so they never
+        # occupy an analysis worker slot
+        if os.stat(filename).st_size == 0:
+            raise ValueError(f"Downloaded file is empty: {filename}")
+
+        # Both post-download updates share one commit
+        crud.update_episode_audio_path(db, episode_id, filename, commit=False)
+        crud.update_episode_status(db, episode_id, models.ProcessingStatus.ANALYZING, commit=False)
+        db.commit()
+
+        analyze_podcast.delay(episode_id, filename)
+        return filename
+    except Exception as exc:
+        logger.error(f"Download failed for episode {episode_id}: {str(exc)}", exc_info=True)
+        # The failure may have left the session mid-transaction; roll back
+        # first or the FAILED update itself raises PendingRollbackError
+        db.rollback()
+        crud.update_episode_status(db, episode_id, models.ProcessingStatus.FAILED)
+        raise self.retry(exc=exc)
+    finally:
+        db.close()